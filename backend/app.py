@@ -1,11 +1,14 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
+import orjson
 import torch
 import numpy as np
 from pinn_model import BurgersPINN, generate_training_data
 from numerical_solver import solve_burgers_numerical
+import functools
+import queue
 import threading
-import time
+from concurrent.futures import ThreadPoolExecutor
 
 app = Flask(__name__, template_folder='../frontend/templates', 
             static_folder='../frontend/static')
@@ -17,13 +20,73 @@ training_state = {
     'current_epoch': 0,
     'pinn': None,
     'training_data': None,
-    'stop_requested': False
+    'stop_requested': False,
+    'future': None
 }
 
+# Single-worker executor for training runs. The model must stay in this
+# process (the prediction endpoints read it from training_state), so a
+# process pool is not an option; the executor still serializes runs and
+# surfaces worker exceptions through the future instead of losing them
+# in a bare daemon thread.
+training_executor = ThreadPoolExecutor(max_workers=1)
+
+# Separate worker for the numerical reference solve so /predict can run
+# it concurrently with the PINN forward (the jitted stepper drops the GIL)
+solver_executor = ThreadPoolExecutor(max_workers=1)
+
+# SSE subscribers: each connected client gets its own queue of per-epoch
+# loss deltas, so the server never re-serializes the full history
+loss_subscribers = []
+subscribers_lock = threading.Lock()
+
+
+def publish_loss(message):
+    """Push a loss delta to every connected SSE subscriber"""
+    with subscribers_lock:
+        for q in loss_subscribers:
+            q.put(message)
+
+def json_response(payload):
+    """
+    Serialize a payload that may contain NumPy arrays with orjson, which
+    writes floats straight from the C buffers instead of materializing
+    tens of thousands of Python objects the way .tolist() + jsonify does.
+    """
+    # orjson requires C-contiguous buffers (autograd outputs may not be)
+    payload = {key: np.ascontiguousarray(value)
+               if isinstance(value, np.ndarray) else value
+               for key, value in payload.items()}
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+                    mimetype='application/json')
+
+
+@functools.lru_cache(maxsize=32)
+def _solve_cached(nx, nt, nu, x0, x1, t0, t1):
+    """Memoized numerical solve; inputs are deterministic per parameter set"""
+    x, t, U = solve_burgers_numerical(nx=nx, nt=nt, nu=nu,
+                                      x_range=(x0, x1), t_range=(t0, t1))
+    # Cached arrays are shared across requests, so guard against mutation
+    for arr in (x, t, U):
+        arr.setflags(write=False)
+    return x, t, U
+
+
 def train_worker(epochs, nu, hidden_layers, lr):
     """Background worker for training"""
     global training_state
-    
+
+    try:
+        _run_training(epochs, nu, hidden_layers, lr)
+    finally:
+        # Always leave a consistent state, even if a step raised
+        training_state['is_training'] = False
+        training_state['stop_requested'] = False
+        publish_loss({'done': True})
+
+
+def _run_training(epochs, nu, hidden_layers, lr):
+    """Training loop body; state cleanup lives in train_worker"""
     # Initialize PINN
     pinn = BurgersPINN(nu=nu, hidden_layers=hidden_layers, lr=lr)
     training_state['pinn'] = pinn
@@ -32,32 +95,42 @@ def train_worker(epochs, nu, hidden_layers, lr):
     data = generate_training_data()
     training_state['training_data'] = data
     
-    # Convert to tensors
-    device = pinn.device
-    x_pde = torch.FloatTensor(data['x_pde']).to(device)
-    t_pde = torch.FloatTensor(data['t_pde']).to(device)
-    x_ic = torch.FloatTensor(data['x_ic']).to(device)
-    t_ic = torch.FloatTensor(data['t_ic']).to(device)
-    u_ic = torch.FloatTensor(data['u_ic']).to(device)
-    x_bc = torch.FloatTensor(data['x_bc']).to(device)
-    t_bc = torch.FloatTensor(data['t_bc']).to(device)
-    u_bc = torch.FloatTensor(data['u_bc']).to(device)
-    
-    # Training loop
+    # Convert to tensors (pinned + async H2D copy on GPU); PDE collocation
+    # points come from the on-device Sobol sampler inside the epoch loop
+    n_pde = data['x_pde'].shape[0]
+    x_ic = pinn.to_device(data['x_ic'])
+    t_ic = pinn.to_device(data['t_ic'])
+    u_ic = pinn.to_device(data['u_ic'])
+    x_bc = pinn.to_device(data['x_bc'])
+    t_bc = pinn.to_device(data['t_bc'])
+    u_bc = pinn.to_device(data['u_bc'])
+    
+    # Training loop; resample collocation points periodically so no
+    # region of the domain stays under-sampled for the whole run
+    resample_every = 500
+    x_pde, t_pde = None, None
     for epoch in range(epochs):
         if training_state['stop_requested']:
             break
-            
-        losses = pinn.train_step(x_pde, t_pde, x_ic, t_ic, u_ic, x_bc, t_bc, u_bc)
-        
+
+        if epoch % resample_every == 0:
+            x_pde, t_pde = pinn.sample_collocation(n_pde)
+            # Keep the collocation-points endpoint in sync with what is
+            # actually being trained on
+            data['x_pde'] = x_pde.detach().cpu().numpy()
+            data['t_pde'] = t_pde.detach().cpu().numpy()
+
+        flushed = pinn.train_step(x_pde, t_pde, x_ic, t_ic, u_ic, x_bc, t_bc, u_bc)
+
         training_state['current_epoch'] = epoch + 1
-        
-        # Small delay to allow API calls
-        if epoch % 10 == 0:
-            time.sleep(0.01)
-    
-    training_state['is_training'] = False
-    training_state['stop_requested'] = False
+        # Losses arrive in blocks when the device-side buffer flushes
+        if flushed is not None:
+            publish_loss({'epoch': epoch + 1, 'losses': flushed})
+
+    # Push the trailing partial block so subscribers see every epoch
+    flushed = pinn.flush_losses()
+    if flushed is not None:
+        publish_loss({'epoch': training_state['current_epoch'], 'losses': flushed})
 
 
 @app.route('/')
@@ -86,11 +159,9 @@ def start_training():
     training_state['current_epoch'] = 0
     training_state['stop_requested'] = False
     
-    # Start training in background thread
-    thread = threading.Thread(target=train_worker, 
-                             args=(epochs, nu, hidden_layers, lr))
-    thread.daemon = True
-    thread.start()
+    # Submit training to the single-worker executor
+    training_state['future'] = training_executor.submit(
+        train_worker, epochs, nu, hidden_layers, lr)
     
     return jsonify({'status': 'Training started'})
 
@@ -108,23 +179,39 @@ def training_status():
     """Get current training status"""
     global training_state
     
-    status = {
+    # Loss values are streamed incrementally over /api/training_stream;
+    # this endpoint only reports the lightweight state
+    return jsonify({
         'is_training': training_state['is_training'],
-        'current_epoch': training_state['current_epoch'],
-        'losses': None
-    }
-    
-    if training_state['pinn'] is not None:
-        # Get recent losses
-        history = training_state['pinn'].loss_history
-        status['losses'] = {
-            'total': history['total'][-100:] if len(history['total']) > 0 else [],
-            'pde': history['pde'][-100:] if len(history['pde']) > 0 else [],
-            'ic': history['ic'][-100:] if len(history['ic']) > 0 else [],
-            'bc': history['bc'][-100:] if len(history['bc']) > 0 else []
-        }
-    
-    return jsonify(status)
+        'current_epoch': training_state['current_epoch']
+    })
+
+
+@app.route('/api/training_stream')
+def training_stream():
+    """Stream per-epoch loss deltas as server-sent events"""
+    q = queue.Queue()
+    with subscribers_lock:
+        loss_subscribers.append(q)
+
+    def event_stream():
+        try:
+            while True:
+                try:
+                    message = q.get(timeout=30)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keepalive\n\n'
+                    continue
+                yield 'data: ' + orjson.dumps(message).decode() + '\n\n'
+                if message.get('done'):
+                    break
+        finally:
+            with subscribers_lock:
+                loss_subscribers.remove(q)
+
+    return Response(stream_with_context(event_stream()),
+                    mimetype='text/event-stream')
 
 
 @app.route('/api/predict', methods=['POST'])
@@ -149,24 +236,28 @@ def predict():
     x_flat = X.flatten()
     t_flat = T.flatten()
     
+    # Kick off the numerical reference (cached across requests) so it
+    # overlaps with the PINN forward instead of running after it
+    reference_future = solver_executor.submit(
+        _solve_cached, nx, nt, training_state['pinn'].nu,
+        x_range[0], x_range[1], t_range[0], t_range[1]
+    )
+
     u_pred = training_state['pinn'].predict(x_flat, t_flat)
     U_pred = u_pred.reshape(nt, nx)
-    
-    # Get numerical solution for comparison
-    x_num, t_num, U_numerical = solve_burgers_numerical(
-        nx=nx, nt=nt, nu=training_state['pinn'].nu,
-        x_range=x_range, t_range=t_range
-    )
+
+    # Join with the reference just before the error subtraction
+    x_num, t_num, U_numerical = reference_future.result()
     
     # Compute error
     error = np.abs(U_pred - U_numerical)
     
-    return jsonify({
-        'x': x.tolist(),
-        't': t.tolist(),
-        'u_pred': U_pred.tolist(),
-        'u_analytical': U_numerical.tolist(),
-        'error': error.tolist()
+    return json_response({
+        'x': x,
+        't': t,
+        'u_pred': U_pred,
+        'u_analytical': U_numerical,
+        'error': error
     })
 
 
@@ -186,17 +277,18 @@ def get_residuals():
     t = np.linspace(0, 1, n_points)
     X, T = np.meshgrid(x, t)
     
-    x_flat = torch.FloatTensor(X.flatten()).reshape(-1, 1).to(training_state['pinn'].device)
-    t_flat = torch.FloatTensor(T.flatten()).reshape(-1, 1).to(training_state['pinn'].device)
+    x_flat, t_flat = training_state['pinn'].grid_to_device(X, T)
     
-    # Compute residuals
-    residuals = training_state['pinn'].compute_pde_residual(x_flat, t_flat)
-    residuals_np = residuals.detach().cpu().numpy().reshape(n_points, n_points)
+    # Compute residuals (bf16 autocast: display-only numbers)
+    pinn = training_state['pinn']
+    with torch.autocast(device_type=pinn.device.type, dtype=torch.bfloat16):
+        residuals = pinn.compute_pde_residual(x_flat, t_flat)
+    residuals_np = residuals.detach().float().cpu().numpy().reshape(n_points, n_points)
     
-    return jsonify({
-        'x': x.tolist(),
-        't': t.tolist(),
-        'residuals': residuals_np.tolist()
+    return json_response({
+        'x': x,
+        't': t,
+        'residuals': residuals_np
     })
 
 
@@ -243,35 +335,35 @@ def get_derivatives():
     t = np.linspace(0, 1, nt)
     X, T = np.meshgrid(x, t)
     
-    x_tensor = torch.FloatTensor(X.flatten()).reshape(-1, 1).to(training_state['pinn'].device)
-    t_tensor = torch.FloatTensor(T.flatten()).reshape(-1, 1).to(training_state['pinn'].device)
+    x_tensor, t_tensor = training_state['pinn'].grid_to_device(X, T)
     
     x_tensor.requires_grad_(True)
     t_tensor.requires_grad_(True)
-    
-    # Compute u and derivatives
-    u = training_state['pinn'].model(x_tensor, t_tensor)
-    
-    u_x = torch.autograd.grad(u, x_tensor, grad_outputs=torch.ones_like(u), 
-                               create_graph=True)[0]
-    u_t = torch.autograd.grad(u, t_tensor, grad_outputs=torch.ones_like(u), 
-                               create_graph=True)[0]
-    u_xx = torch.autograd.grad(u_x, x_tensor, grad_outputs=torch.ones_like(u_x), 
-                                create_graph=True)[0]
-    
+
+    # Compute u and derivatives (bf16 autocast: display-only numbers)
+    pinn = training_state['pinn']
+    with torch.autocast(device_type=pinn.device.type, dtype=torch.bfloat16):
+        u = pinn.model(x_tensor, t_tensor)
+
+        u_x, u_t = torch.autograd.grad(u, (x_tensor, t_tensor),
+                                       grad_outputs=torch.ones_like(u),
+                                       create_graph=True)
+        u_xx = torch.autograd.grad(u_x, x_tensor, grad_outputs=torch.ones_like(u_x),
+                                   create_graph=True)[0]
+
     # Convert to numpy
-    u_np = u.detach().cpu().numpy().reshape(nt, nx)
-    u_x_np = u_x.detach().cpu().numpy().reshape(nt, nx)
-    u_t_np = u_t.detach().cpu().numpy().reshape(nt, nx)
-    u_xx_np = u_xx.detach().cpu().numpy().reshape(nt, nx)
-    
-    return jsonify({
-        'x': x.tolist(),
-        't': t.tolist(),
-        'u': u_np.tolist(),
-        'u_x': u_x_np.tolist(),
-        'u_t': u_t_np.tolist(),
-        'u_xx': u_xx_np.tolist()
+    u_np = u.detach().float().cpu().numpy().reshape(nt, nx)
+    u_x_np = u_x.detach().float().cpu().numpy().reshape(nt, nx)
+    u_t_np = u_t.detach().float().cpu().numpy().reshape(nt, nx)
+    u_xx_np = u_xx.detach().float().cpu().numpy().reshape(nt, nx)
+    
+    return json_response({
+        'x': x,
+        't': t,
+        'u': u_np,
+        'u_x': u_x_np,
+        'u_t': u_t_np,
+        'u_xx': u_xx_np
     })
 
 
@@ -2,8 +2,59 @@
 Numerical solver for Burgers' equation using finite differences
 """
 import numpy as np
-from scipy.sparse import diags
-from scipy.sparse.linalg import spsolve
+from numba import njit
+
+
+@njit(cache=True, fastmath=True, boundscheck=False, nogil=True)
+def _burgers_step(U, nu, dx, dt, nx, nt):
+    """
+    Semi-implicit Crank-Nicolson time stepping, JIT-compiled.
+
+    Diffusion is treated implicitly (Crank-Nicolson averaging), advection
+    explicitly with upwinding. Each step solves one tri-diagonal system
+    for the interior nodes with the Thomas algorithm, O(nx) per step.
+    """
+    r = nu * dt / (dx**2)
+    m = nx - 2  # number of interior unknowns
+
+    # Tri-diagonal matrix A = I - (r/2)*L is constant: diagonal 1 + r,
+    # off-diagonals -r/2. Precompute the Thomas forward-sweep
+    # coefficients once outside the time loop.
+    a = -0.5 * r  # sub- and super-diagonal
+    b = 1.0 + r   # main diagonal
+    cp = np.empty(m)
+    cp[0] = a / b
+    for i in range(1, m):
+        cp[i] = a / (b - a * cp[i-1])
+
+    rhs = np.empty(m)
+    dp = np.empty(m)
+
+    for n in range(nt - 1):
+        # RHS: (I + (r/2)*L) u - dt * u * du/dx (upwind advection)
+        for i in range(1, nx - 1):
+            if U[n, i] > 0:
+                du_dx = (U[n, i] - U[n, i-1]) / dx
+            else:
+                du_dx = (U[n, i+1] - U[n, i]) / dx
+
+            rhs[i-1] = (U[n, i]
+                        + 0.5 * r * (U[n, i+1] - 2*U[n, i] + U[n, i-1])
+                        - dt * U[n, i] * du_dx)
+
+        # Thomas algorithm: forward sweep then back substitution
+        dp[0] = rhs[0] / b
+        for i in range(1, m):
+            dp[i] = (rhs[i] - a * dp[i-1]) / (b - a * cp[i-1])
+
+        U[n+1, nx-2] = dp[m-1]
+        for i in range(m - 2, -1, -1):
+            U[n+1, i+1] = dp[i] - cp[i] * U[n+1, i+2]
+
+        # Ensure boundary conditions
+        U[n+1, 0] = 0
+        U[n+1, -1] = 0
+
 
 def solve_burgers_numerical(nx=100, nt=100, nu=0.01, x_range=(-1, 1), t_range=(0, 1)):
     """
@@ -35,31 +86,10 @@ def solve_burgers_numerical(nx=100, nt=100, nu=0.01, x_range=(-1, 1), t_range=(0
     U[:, 0] = 0
     U[:, -1] = 0
     
-    # Time stepping with simple explicit scheme for demonstration
-    # For better accuracy, would use implicit or Crank-Nicolson
-    r = nu * dt / (dx**2)
-    
-    for n in range(nt - 1):
-        u_old = U[n, :].copy()
-        
-        # Interior points using FTCS (Forward Time Central Space)
-        for i in range(1, nx - 1):
-            # Advection term: -u * du/dx (using upwind)
-            if u_old[i] > 0:
-                du_dx = (u_old[i] - u_old[i-1]) / dx
-            else:
-                du_dx = (u_old[i+1] - u_old[i]) / dx
-            
-            # Diffusion term: nu * d2u/dx2
-            d2u_dx2 = (u_old[i+1] - 2*u_old[i] + u_old[i-1]) / (dx**2)
-            
-            # Update
-            U[n+1, i] = u_old[i] + dt * (-u_old[i] * du_dx + nu * d2u_dx2)
-        
-        # Ensure boundary conditions
-        U[n+1, 0] = 0
-        U[n+1, -1] = 0
-    
+    # Semi-implicit Crank-Nicolson stepping: implicit diffusion keeps the
+    # scheme stable for dt well beyond the explicit dx^2/(2*nu) limit
+    _burgers_step(U, nu, dx, dt, nx, nt)
+
     return x, t, U
 
 
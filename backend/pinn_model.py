@@ -1,6 +1,14 @@
 import torch
 import torch.nn as nn
 import numpy as np
+from collections import deque
+
+# Shapes are fixed across a training run, so let cuDNN autotune kernels
+# on first use, and allow TF32 matmuls (near-fp32 accuracy at roughly
+# twice the throughput on Ampere and newer)
+torch.backends.cudnn.benchmark = True
+torch.backends.cuda.matmul.allow_tf32 = True
+torch.set_float32_matmul_precision('high')
 
 class PINN(nn.Module):
     """Physics-Informed Neural Network for Burgers' Equation"""
@@ -9,45 +17,35 @@ class PINN(nn.Module):
         super(PINN, self).__init__()
         
         # Network architecture: 2 inputs (x, t) -> hidden layers -> 1 output (u)
-        layers = []
-        input_dim = 2
         output_dim = 1
-        
-        # Input layer
-        layers.append(nn.Linear(input_dim, hidden_layers[0]))
-        
-        # Hidden layers
-        for i in range(len(hidden_layers) - 1):
-            layers.append(nn.Linear(hidden_layers[i], hidden_layers[i + 1]))
-        
-        # Output layer
-        layers.append(nn.Linear(hidden_layers[-1], output_dim))
-        
-        self.layers = nn.ModuleList(layers)
-        
+
         # Activation function
-        if activation == 'tanh':
-            self.activation = nn.Tanh()
-        elif activation == 'relu':
-            self.activation = nn.ReLU()
+        if activation == 'relu':
+            activation_cls = nn.ReLU
         elif activation == 'sigmoid':
-            self.activation = nn.Sigmoid()
+            activation_cls = nn.Sigmoid
         else:
-            self.activation = nn.Tanh()
-    
+            activation_cls = nn.Tanh
+
+        # First layer reads x and t through separate weights summed --
+        # mathematically identical to nn.Linear(2, h) on torch.cat([x, t])
+        # but with no concat allocation or autograd node per forward
+        self.linx = nn.Linear(1, hidden_layers[0], bias=True)
+        self.lint = nn.Linear(1, hidden_layers[0], bias=False)
+
+        # Remaining stack as a flat Sequential so it dispatches as one
+        # module call instead of a Python loop over layers
+        layers = [activation_cls()]
+        for i in range(len(hidden_layers) - 1):
+            layers.append(nn.Linear(hidden_layers[i], hidden_layers[i + 1]))
+            layers.append(activation_cls())
+        layers.append(nn.Linear(hidden_layers[-1], output_dim))
+
+        self.net = nn.Sequential(*layers)
+
     def forward(self, x, t):
         """Forward pass through the network"""
-        # Concatenate inputs
-        inputs = torch.cat([x, t], dim=1)
-        
-        # Pass through layers
-        for i in range(len(self.layers) - 1):
-            inputs = self.layers[i](inputs)
-            inputs = self.activation(inputs)
-        
-        # Output layer (no activation)
-        u = self.layers[-1](inputs)
-        return u
+        return self.net(self.linx(x) + self.lint(t))
 
 
 class BurgersPINN:
@@ -66,17 +64,46 @@ class BurgersPINN:
         self.nu = nu
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
-        # Create network
+        # Create network; training stays on the eager module because the
+        # PDE residual needs double backward (create_graph=True), which
+        # torch.compile's AOTAutograd does not support. Inference goes
+        # through a compiled alias that shares the same parameters, so
+        # TorchInductor fuses the linear+activation chain for predict.
         self.model = PINN(hidden_layers, activation).to(self.device)
-        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr)
+        self.inference_model = torch.compile(self.model, mode="reduce-overhead", fullgraph=False)
+        # Fused Adam runs one kernel over all parameters instead of ~2 per
+        # tensor per step; only available on CUDA, foreach covers CPU
+        if torch.cuda.is_available():
+            self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, fused=True)
+        else:
+            self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr, foreach=True)
+
+        # Dedicated stream for host-to-device copies so transfers overlap
+        # with compute instead of stalling the default stream
+        self.copy_stream = torch.cuda.Stream() if self.device.type == 'cuda' else None
+
+        # Pool of device tensors for prediction grids, keyed by point
+        # count and reused across HTTP requests of the same size
+        self._grid_pool = {}
+
+        # Quasi-random sampler for PDE collocation points; low-discrepancy
+        # draws cover the domain more evenly than uniform random
+        self.sobol = torch.quasirandom.SobolEngine(dimension=2, scramble=True)
         
-        # Training history
+        # Training history (bounded so long runs don't grow memory forever)
         self.loss_history = {
-            'total': [],
-            'pde': [],
-            'ic': [],
-            'bc': []
+            'total': deque(maxlen=10000),
+            'pde': deque(maxlen=10000),
+            'ic': deque(maxlen=10000),
+            'bc': deque(maxlen=10000)
         }
+
+        # Device-side staging buffer for loss scalars; .item() per step
+        # would force a GPU sync, so losses only cross to the host when
+        # the buffer fills (see flush_losses)
+        self._loss_flush_every = 100
+        self._loss_buffer = torch.empty((self._loss_flush_every, 4), device=self.device)
+        self._loss_count = 0
         
     def compute_pde_residual(self, x, t):
         """
@@ -85,16 +112,19 @@ class BurgersPINN:
         """
         x.requires_grad_(True)
         t.requires_grad_(True)
-        
+
         # Forward pass
         u = self.model(x, t)
-        
-        # First derivatives
-        u_x = torch.autograd.grad(u, x, grad_outputs=torch.ones_like(u), 
-                                   create_graph=True)[0]
-        u_t = torch.autograd.grad(u, t, grad_outputs=torch.ones_like(u), 
-                                   create_graph=True)[0]
-        
+
+        return self._residual_from_output(u, x, t)
+
+    def _residual_from_output(self, u, x, t):
+        """Compute the PDE residual from a network output u = u(x, t)"""
+        # First derivatives: one grad call over both inputs walks the
+        # graph once instead of twice
+        u_x, u_t = torch.autograd.grad(u, (x, t), grad_outputs=torch.ones_like(u),
+                                       create_graph=True)
+
         # Second derivative
         u_xx = torch.autograd.grad(u_x, x, grad_outputs=torch.ones_like(u_x), 
                                     create_graph=True)[0]
@@ -108,16 +138,28 @@ class BurgersPINN:
         """
         Compute total loss = PDE loss + IC loss + BC loss
         """
-        # PDE residual loss
-        residual = self.compute_pde_residual(x_pde, t_pde)
+        # One batched forward pass over PDE + IC + BC points; separate
+        # calls on this small net are launch-overhead-bound
+        x_pde.requires_grad_(True)
+        t_pde.requires_grad_(True)
+
+        n_pde = x_pde.shape[0]
+        n_ic = x_ic.shape[0]
+
+        x_all = torch.cat([x_pde, x_ic, x_bc])
+        t_all = torch.cat([t_pde, t_ic, t_bc])
+        u_all = self.model(x_all, t_all)
+
+        # PDE residual loss (grad wrt x_pde/t_pde flows through the cat)
+        residual = self._residual_from_output(u_all[:n_pde], x_pde, t_pde)
         loss_pde = torch.mean(residual ** 2)
-        
+
         # Initial condition loss
-        u_ic_pred = self.model(x_ic, t_ic)
+        u_ic_pred = u_all[n_pde:n_pde + n_ic]
         loss_ic = torch.mean((u_ic_pred - u_ic) ** 2)
-        
+
         # Boundary condition loss
-        u_bc_pred = self.model(x_bc, t_bc)
+        u_bc_pred = u_all[n_pde + n_ic:]
         loss_bc = torch.mean((u_bc_pred - u_bc) ** 2)
         
         # Total loss
@@ -126,38 +168,120 @@ class BurgersPINN:
         return loss_total, loss_pde, loss_ic, loss_bc
     
     def train_step(self, x_pde, t_pde, x_ic, t_ic, u_ic, x_bc, t_bc, u_bc):
-        """Perform one training step"""
-        self.optimizer.zero_grad()
-        
+        """
+        Perform one training step.
+
+        Losses stay on the device in the staging buffer; when it fills,
+        the block is flushed to loss_history and returned as a dict of
+        lists, otherwise None. Callers wanting the trailing partial
+        block (e.g. at the end of training) should call flush_losses.
+        """
+        self.optimizer.zero_grad(set_to_none=True)
+
         loss_total, loss_pde, loss_ic, loss_bc = self.loss_function(
             x_pde, t_pde, x_ic, t_ic, u_ic, x_bc, t_bc, u_bc
         )
-        
+
         loss_total.backward()
         self.optimizer.step()
-        
-        losses = {
-            'total': loss_total.item(),
-            'pde': loss_pde.item(),
-            'ic': loss_ic.item(),
-            'bc': loss_bc.item()
-        }
-        
-        # Update history
-        for key in losses:
-            self.loss_history[key].append(losses[key])
-        
-        return losses
+
+        self._loss_buffer[self._loss_count] = torch.stack([
+            loss_total.detach(), loss_pde.detach(),
+            loss_ic.detach(), loss_bc.detach()
+        ])
+        self._loss_count += 1
+
+        if self._loss_count == self._loss_flush_every:
+            return self.flush_losses()
+        return None
+
+    def flush_losses(self):
+        """
+        Copy the buffered device-side losses to the host, append them to
+        loss_history, and return them as {'total': [...], 'pde': [...],
+        'ic': [...], 'bc': [...]}; None if the buffer is empty.
+        """
+        if self._loss_count == 0:
+            return None
+
+        block = self._loss_buffer[:self._loss_count].cpu().numpy()
+        self._loss_count = 0
+
+        flushed = {}
+        for i, key in enumerate(('total', 'pde', 'ic', 'bc')):
+            values = block[:, i].tolist()
+            self.loss_history[key].extend(values)
+            flushed[key] = values
+        return flushed
     
+    def to_device(self, arr):
+        """
+        Move a NumPy array to the model device as a float32 column tensor.
+        On GPU, the copy goes through pinned memory on the copy stream so
+        it overlaps with any in-flight compute.
+        """
+        arr = np.ascontiguousarray(arr, dtype=np.float32).reshape(-1, 1)
+        tensor = torch.from_numpy(arr)
+        if self.copy_stream is not None:
+            tensor = tensor.pin_memory()
+            with torch.cuda.stream(self.copy_stream):
+                tensor = tensor.to(self.device, non_blocking=True)
+            self.copy_stream.synchronize()
+            return tensor
+        return tensor.to(self.device)
+
+    def sample_collocation(self, n, x_range=(-1, 1), t_range=(0, 1)):
+        """
+        Draw n PDE collocation points from the scrambled Sobol sequence
+        as device tensors, with no NumPy intermediate.
+        """
+        points = self.sobol.draw(n).to(self.device)
+        x = x_range[0] + (x_range[1] - x_range[0]) * points[:, 0:1]
+        t = t_range[0] + (t_range[1] - t_range[0]) * points[:, 1:2]
+        return x.contiguous(), t.contiguous()
+
+    def grid_to_device(self, x, t):
+        """
+        Copy a prediction grid into pooled device tensors, reusing the
+        allocation across requests of the same size instead of paying
+        malloc/free churn per call.
+        """
+        x = np.ascontiguousarray(x, dtype=np.float32).reshape(-1, 1)
+        t = np.ascontiguousarray(t, dtype=np.float32).reshape(-1, 1)
+        n = x.shape[0]
+
+        if n not in self._grid_pool:
+            self._grid_pool[n] = (torch.empty(n, 1, device=self.device),
+                                  torch.empty(n, 1, device=self.device))
+        x_tensor, t_tensor = self._grid_pool[n]
+
+        for tensor, arr in ((x_tensor, x), (t_tensor, t)):
+            # Callers may have flagged the pooled tensor for autograd;
+            # clear it so the in-place copy stays untracked
+            tensor.requires_grad_(False)
+            tensor.grad = None
+            src = torch.from_numpy(arr)
+            if self.copy_stream is not None:
+                src = src.pin_memory()
+                with torch.cuda.stream(self.copy_stream):
+                    tensor.copy_(src, non_blocking=True)
+                self.copy_stream.synchronize()
+            else:
+                tensor.copy_(src)
+
+        return x_tensor, t_tensor
+
     def predict(self, x, t):
         """Make prediction"""
         self.model.eval()
         with torch.no_grad():
-            x_tensor = torch.FloatTensor(x).reshape(-1, 1).to(self.device)
-            t_tensor = torch.FloatTensor(t).reshape(-1, 1).to(self.device)
-            u = self.model(x_tensor, t_tensor)
+            x_tensor, t_tensor = self.grid_to_device(x, t)
+            # bf16 is plenty for display-bound inference: half the
+            # bandwidth, and tensor cores / VNNI double the throughput
+            with torch.autocast(device_type=self.device.type, dtype=torch.bfloat16):
+                u = self.inference_model(x_tensor, t_tensor)
         self.model.train()
-        return u.cpu().numpy()
+        return u.float().cpu().numpy()
 
 
 def generate_training_data(x_range=(-1, 1), t_range=(0, 1), 
@@ -187,17 +311,16 @@ def generate_training_data(x_range=(-1, 1), t_range=(0, 1),
     
     # Boundary condition points (x = x_min and x = x_max)
     t_bc = np.random.uniform(t_min, t_max, (n_bc, 1))
-    x_bc_left = np.full((n_bc // 2, 1), x_min)
-    x_bc_right = np.full((n_bc - n_bc // 2, 1), x_max)
-    x_bc = np.vstack([x_bc_left, x_bc_right])
-    t_bc_full = np.vstack([t_bc[:n_bc // 2], t_bc[n_bc // 2:]])
+    x_bc = np.empty((n_bc, 1))
+    x_bc[:n_bc // 2] = x_min
+    x_bc[n_bc // 2:] = x_max
     # Boundary condition: u(±1, t) = 0
     u_bc = np.zeros((n_bc, 1))
-    
+
     return {
         'x_pde': x_pde, 't_pde': t_pde,
         'x_ic': x_ic, 't_ic': t_ic, 'u_ic': u_ic,
-        'x_bc': x_bc, 't_bc': t_bc_full, 'u_bc': u_bc
+        'x_bc': x_bc, 't_bc': t_bc, 'u_bc': u_bc
     }
 
 
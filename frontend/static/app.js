@@ -2,7 +2,8 @@
 const API_BASE = 'http://localhost:5000/api';
 
 // State
-let trainingInterval = null;
+let lossStream = null;
+let lossBuffers = null;
 let isTraining = false;
 
 // DOM Elements
@@ -45,8 +46,8 @@ startBtn.addEventListener('click', async () => {
             stateSpan.textContent = 'Training...';
             stateSpan.style.color = '#28a745';
             
-            // Start polling for updates
-            startPolling();
+            // Subscribe to streamed loss updates
+            startLossStream();
         } else {
             alert('Failed to start training');
         }
@@ -60,56 +61,64 @@ startBtn.addEventListener('click', async () => {
 stopBtn.addEventListener('click', async () => {
     try {
         await fetch(`${API_BASE}/stop_training`, { method: 'POST' });
-        stopPolling();
+        stopLossStream();
     } catch (error) {
         console.error('Error:', error);
     }
 });
 
-// Polling for training status
-function startPolling() {
-    if (trainingInterval) {
-        clearInterval(trainingInterval);
+// Server-sent events: the backend pushes only the per-epoch loss delta
+// and the client keeps its own buffer for plotting
+function startLossStream() {
+    if (lossStream) {
+        lossStream.close();
     }
-    
-    trainingInterval = setInterval(async () => {
-        try {
-            const response = await fetch(`${API_BASE}/training_status`);
-            const data = await response.json();
-            
-            // Update status
-            epochSpan.textContent = data.current_epoch;
-            
-            if (data.losses && data.losses.total.length > 0) {
-                const latestLoss = data.losses.total[data.losses.total.length - 1];
-                lossTotalSpan.textContent = latestLoss.toExponential(3);
-                
-                // Update loss plot
-                updateLossPlot(data.losses);
-            }
-            
-            // Check if training finished
-            if (!data.is_training && isTraining) {
-                stopPolling();
-                stateSpan.textContent = 'Completed';
-                stateSpan.style.color = '#007bff';
-                
-                // Update predictions
-                await updatePredictions();
-                await updateResiduals();
-                await updateCollocationPoints();
-                await updateDerivatives();
-            }
-        } catch (error) {
-            console.error('Polling error:', error);
+
+    lossBuffers = { total: [], pde: [], ic: [], bc: [] };
+
+    lossStream = new EventSource(`${API_BASE}/training_stream`);
+    lossStream.onmessage = async (event) => {
+        const data = JSON.parse(event.data);
+
+        // Check if training finished
+        if (data.done) {
+            stopLossStream();
+            stateSpan.textContent = 'Completed';
+            stateSpan.style.color = '#007bff';
+
+            // Update predictions
+            await updatePredictions();
+            await updateResiduals();
+            await updateCollocationPoints();
+            await updateDerivatives();
+            return;
         }
-    }, 500);
+
+        // Each message carries a block of epochs (the backend buffers
+        // losses on-device and flushes every ~100 steps)
+        epochSpan.textContent = data.epoch;
+        const totals = data.losses.total;
+        lossTotalSpan.textContent = totals[totals.length - 1].toExponential(3);
+
+        for (const key of Object.keys(lossBuffers)) {
+            lossBuffers[key].push(...data.losses[key]);
+        }
+
+        updateLossPlot(lossBuffers);
+    };
+
+    lossStream.onerror = (error) => {
+        console.error('Loss stream error:', error);
+    };
 }
 
-function stopPolling() {
-    if (trainingInterval) {
-        clearInterval(trainingInterval);
-        trainingInterval = null;
+function stopLossStream() {
+    if (lossStream) {
+        lossStream.close();
+        lossStream = null;
+    }
+    if (lossBuffers) {
+        updateLossPlot(lossBuffers);
     }
     isTraining = false;
     startBtn.disabled = false;